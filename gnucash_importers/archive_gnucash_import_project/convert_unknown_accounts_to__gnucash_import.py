@@ -1,27 +1,23 @@
 import csv
+import os
+import sqlite3
 import argparse
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
 
-try:
-    from piecash import open_book
-except ImportError:
-    open_book = None  # Will check later if DB is used
-
-import warnings
-from sqlalchemy.exc import SAWarning
-# Filter out specific warnings from piecash
-# This is to avoid cluttering the output with known warnings that are not relevant to this script
-warnings.filterwarnings("ignore", category=SAWarning, module="piecash")    
-
 DEFAULT_INPUT_PREFIX = "unknown_accounts_"
 DEFAULT_PARENT_NAME = "Expenses"
 
 def get_default_input_file() -> Path | None:
-    matches = sorted(Path.cwd().glob(f"{DEFAULT_INPUT_PREFIX}*"))
+    cwd = Path.cwd()
+    # One scandir pass; only the matching name (if unique) becomes a Path
+    prefix = os.path.normcase(DEFAULT_INPUT_PREFIX)
+    with os.scandir(cwd) as it:
+        matches = [e.name for e in it
+                   if os.path.normcase(e.name).startswith(prefix) and e.is_file()]
     if len(matches) == 1:
-        return matches[0]
+        return cwd / matches[0]
     elif len(matches) == 0:
         logger.warning(f"No input files starting with '{DEFAULT_INPUT_PREFIX}' found.")
     else:
@@ -48,17 +44,21 @@ def load_input_file(input_path: Path) -> list[str]:
         return [row[0].strip() for row in reader if row and row[0].strip()]
 
 def read_existing_expense_accounts(db_path: Path) -> set[str] | None:
-    if not open_book:
-        logger.warning("piecash module not available. Proceeding without database check.")
-        return None
+    # Query the SQLite book directly (read-only) rather than hydrating it through piecash
     try:
-        with open_book(db_path, readonly=True) as book:
-            root = book.root_account
-            parent = next((a for a in root.descendants if a.name == DEFAULT_PARENT_NAME and a.type.name == "EXPENSE"), None)
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            parent = conn.execute(
+                "SELECT guid FROM accounts WHERE name = ? AND account_type = 'EXPENSE'",
+                (DEFAULT_PARENT_NAME,),
+            ).fetchone()
             if not parent:
                 logger.warning(f"Parent account '{DEFAULT_PARENT_NAME}' not found. Proceeding as if all accounts are new.")
                 return None
-            return {a.name for a in parent.children}
+            cur = conn.execute("SELECT name FROM accounts WHERE parent_guid = ?", (parent[0],))
+            return {row[0] for row in cur}
+        finally:
+            conn.close()
     except Exception as e:
         logger.warning(f"Could not read database ({db_path}): {e}")
         return None
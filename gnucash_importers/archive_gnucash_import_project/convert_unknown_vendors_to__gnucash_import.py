@@ -1,9 +1,17 @@
+import asyncio
 import csv
+import operator
 import sys
 import os
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from functools import lru_cache
 from pytimedinput import timedInput
+try:
+    import orjson
+except ImportError:  # fall back to the (slower) stdlib parser
+    import json as orjson
 from dotenv import load_dotenv
 
 import warnings
@@ -23,14 +31,40 @@ VENDOR_FIELDS = [
 ]
 
 INPUT_TIMEOUT = 30  # seconds
+POLITE_DELAY = 2  # seconds between Places searches, to avoid rate limits
+OUTPUT_BUFFER_SIZE = 1 << 20  # bytes; lets many CSV rows share one write() syscall
 PLACES_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 PLACES_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+# Fields copied from the enriched record onto other records for the same company
+ENRICHED_FIELDS = ("addr1", "phone", "notes")
+
+# Transient Places failures (rate limit / server errors) are retried with
+# exponential backoff instead of aborting the whole run
+RETRY_POLICY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    allowed_methods=frozenset(["GET"]),
+)
+
+# One keep-alive session for every Places call, so the TLS handshake is paid once
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=RETRY_POLICY,
+))
 
 
 def find_default_input_file():
-    for fname in os.listdir('.'):
-        if fname.startswith("unknown_vendors_") and fname.endswith(".csv"):
-            return fname
+    # scandir yields cached entry types, so non-matches cost no extra stat()
+    with os.scandir('.') as it:
+        for entry in it:
+            fname = entry.name
+            if (fname.startswith("unknown_vendors_") and fname.endswith(".csv")
+                    and entry.is_file(follow_symlinks=False)):
+                return fname
     return None
 
 
@@ -48,9 +82,9 @@ def read_names(input_filename):
 
 def create_vendor_records(company_names):
     records = []
+    template = dict.fromkeys(VENDOR_FIELDS, "")
     for company in company_names:
-        record = {field: "" for field in VENDOR_FIELDS}
-        record["id"] = ""
+        record = template.copy()
         record["company"] = company
         record["name"] = "unknown contact"
         records.append(record)
@@ -58,19 +92,26 @@ def create_vendor_records(company_names):
 
 
 def google_places_search(company_name, max_results=5):
+    # Collapse whitespace/case so trivially different spellings share one request
+    query = " ".join(company_name.split()).casefold()
+    return list(_places_search(query, max_results))
+
+
+@lru_cache(maxsize=4096)
+def _places_search(query, max_results):
     if not API_KEY:
         raise RuntimeError("Google Places API key not available.")
     params = {
-        "query": company_name,
+        "query": query,
         "key": API_KEY
     }
     try:
-        response = requests.get(PLACES_SEARCH_URL, params=params, timeout=10)
+        response = _SESSION.get(PLACES_SEARCH_URL, params=params, timeout=10)
         response.raise_for_status()
-        results = response.json().get("results", [])
-        return results[:max_results]
+        results = orjson.loads(response.content).get("results", [])
+        return tuple(results[:max_results])
     except Exception as e:
-        raise RuntimeError(f"Error searching Google Places for '{company_name}': {e}")
+        raise RuntimeError(f"Error searching Google Places for '{query}': {e}")
 
 
 def google_places_details(place_id):
@@ -82,73 +123,85 @@ def google_places_details(place_id):
         "key": API_KEY
     }
     try:
-        response = requests.get(PLACES_DETAILS_URL, params=params, timeout=10)
+        response = _SESSION.get(PLACES_DETAILS_URL, params=params, timeout=10)
         response.raise_for_status()
-        return response.json().get("result", {})
+        return orjson.loads(response.content).get("result", {})
     except Exception as e:
         raise RuntimeError(f"Error fetching details for place ID {place_id}: {e}")
 
 
-def enrich_vendor_record(record):
+async def enrich_vendor_record(record, places_task):
+    """
+    Let the user pick one of the Places matches for a record and copy its
+    details in. `places_task` is the (possibly already finished) search for
+    this record's company; prompts run in a worker thread so other lookups
+    keep going while the user is thinking.
+    """
     company = record["company"]
-    print(f"\nSearching Google Places for: '{company}'")
+    # Collect note fragments and join once on the way out
+    note_parts = [record["notes"]]
     try:
-        places = google_places_search(company)
-    except Exception as e:
-        print(f"Warning: {e}")
-        record["notes"] += " / Google Places enrichment skipped due to error."
-        return record
+        print(f"\nSearching Google Places for: '{company}'")
+        try:
+            places = await places_task
+        except Exception as e:
+            print(f"Warning: {e}")
+            note_parts.append(" / Google Places enrichment skipped due to error.")
+            return record
 
-    if not places:
-        print("No results found.")
-        record["notes"] += " / No Google Places matches found."
-        return record
+        if not places:
+            print("No results found.")
+            note_parts.append(" / No Google Places matches found.")
+            return record
+
+        print("Top results:")
+        for idx, place in enumerate(places, 1):
+            print(f"{idx}. {place.get('name')} - {place.get('formatted_address')}")
 
-    print("Top results:")
-    for idx, place in enumerate(places, 1):
-        print(f"{idx}. {place.get('name')} - {place.get('formatted_address')}")
+        print("0. Skip enrichment for this vendor")
 
-    print("0. Skip enrichment for this vendor")
+        while True:
+            selection, timed_out = await asyncio.to_thread(
+                timedInput,
+                f"Select match number 1-{len(places)} or 0 to skip (30s timeout): ",
+                timeout=INPUT_TIMEOUT,
+            )
+            if timed_out:
+                print("Input timed out; skipping enrichment for this vendor.")
+                return record
+            if not selection.isdigit():
+                print("Please enter a valid number.")
+                continue
+            selection_num = int(selection)
+            if 0 <= selection_num <= len(places):
+                break
+            else:
+                print("Number out of range.")
 
-    while True:
-        selection, timed_out = timedInput(
-            f"Select match number 1-{len(places)} or 0 to skip (30s timeout): ",
-            timeout=INPUT_TIMEOUT,
-        )
-        if timed_out:
-            print("Input timed out; skipping enrichment for this vendor.")
+        if selection_num == 0:
+            print("Skipping enrichment for this vendor.")
             return record
-        if not selection.isdigit():
-            print("Please enter a valid number.")
-            continue
-        selection_num = int(selection)
-        if 0 <= selection_num <= len(places):
-            break
-        else:
-            print("Number out of range.")
 
-    if selection_num == 0:
-        print("Skipping enrichment for this vendor.")
-        return record
+        chosen_place = places[selection_num - 1]
+        place_id = chosen_place.get("place_id")
 
-    chosen_place = places[selection_num - 1]
-    place_id = chosen_place.get("place_id")
+        try:
+            details = await asyncio.to_thread(google_places_details, place_id)
+        except Exception as e:
+            print(f"Warning: {e}")
+            note_parts.append(" / Google Places details fetch skipped due to error.")
+            return record
 
-    try:
-        details = google_places_details(place_id)
-    except Exception as e:
-        print(f"Warning: {e}")
-        record["notes"] += " / Google Places details fetch skipped due to error."
+        # Update record fields using details
+        record["addr1"] = details.get("formatted_address", chosen_place.get("formatted_address", ""))
+        record["phone"] = details.get("formatted_phone_number", "")
+        if details.get("website"):
+            note_parts.append(f" Website: {details['website']}")
+        note_parts.append(" / Enriched from Google Places.")
+        print("Record enriched with selected place details.")
         return record
-
-    # Update record fields using details
-    record["addr1"] = details.get("formatted_address", chosen_place.get("formatted_address", ""))
-    record["phone"] = details.get("formatted_phone_number", "")
-    if details.get("website"):
-        record["notes"] += f" Website: {details['website']}"
-    record["notes"] += " / Enriched from Google Places."
-    print("Record enriched with selected place details.")
-    return record
+    finally:
+        record["notes"] = "".join(note_parts)
 
 
 def web_enrich_vendor_data(vendor_records):
@@ -163,14 +216,48 @@ def web_enrich_vendor_data(vendor_records):
         print("Skipping enrichment.\n")
         return vendor_records
 
+    # Enrich each distinct company once, then copy the result to its duplicates
+    by_company = {}
     for record in vendor_records:
-        record = enrich_vendor_record(record)
-        time.sleep(2)  # polite delay to avoid rate limit
+        by_company.setdefault(record["company"], []).append(record)
+
+    asyncio.run(_enrich_companies(by_company))
 
     print("Google Places enrichment done.\n")
     return vendor_records
 
 
+async def _search_after(company, previous=None):
+    if previous is not None:
+        # Count the polite delay from the end of the previous search, not from
+        # when its prompt began, so a quick answer can't fire two back to back
+        await asyncio.wait([previous])
+        await asyncio.sleep(POLITE_DELAY)
+    return await asyncio.to_thread(google_places_search, company)
+
+
+async def _enrich_companies(by_company):
+    """
+    Enrich one record per company. The next company's search is queued
+    while the user is still choosing a match for the current one; it runs
+    POLITE_DELAY after the current search finishes, so the delay and the
+    request itself overlap with think-time.
+    """
+    companies = list(by_company)
+    if not companies:
+        return
+    next_search = asyncio.create_task(_search_after(companies[0]))
+    for i, company in enumerate(companies):
+        search = next_search
+        if i + 1 < len(companies):
+            next_search = asyncio.create_task(_search_after(companies[i + 1], search))
+        records = by_company[company]
+        enriched = await enrich_vendor_record(records[0], search)
+        for duplicate in records[1:]:
+            for field in ENRICHED_FIELDS:
+                duplicate[field] = enriched[field]
+
+
 def user_modify_records(vendor_records):
     print(
         f"Please review and optionally modify vendor details (except 'id'). You have {INPUT_TIMEOUT} seconds for each field. Press Enter to keep existing value.\n"
@@ -214,10 +301,12 @@ def user_modify_records(vendor_records):
 
 
 def write_output_csv(output_filename, vendor_records):
-    with open(output_filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=VENDOR_FIELDS)
-        writer.writeheader()
-        writer.writerows(vendor_records)
+    # Project each record to VENDOR_FIELDS order in C instead of via DictWriter
+    project = operator.itemgetter(*VENDOR_FIELDS)
+    with open(output_filename, "w", buffering=OUTPUT_BUFFER_SIZE, newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(VENDOR_FIELDS)
+        writer.writerows(map(project, vendor_records))
 
 
 def main():
@@ -2,8 +2,8 @@
 Interactive GnuCash Bill Builder with Persistent Vendor Defaults
 
 This script interactively builds a CSV file containing bills for import into GnuCash.
-It connects to a GnuCash SQLite database using the `piecash` module to extract known
-vendor names and assists the user in building each bill record through guided prompts.
+It reads the known vendor names straight from a GnuCash SQLite database (cached between
+runs) and assists the user in building each bill record through guided prompts.
 
 Features:
 - Real-time vendor name matching as the user types.
@@ -64,20 +64,26 @@ accu_splits (Accumulate splits; optional)
 """
 
 # import readline  # Enables up-arrow history and editing in terminal input()
+from bisect import bisect_left
 from datetime import datetime
 from pathlib import Path
 import csv
 import sys
 import os
+import re
 import json
+import pickle
+import sqlite3
 from prompt_toolkit import prompt
-from prompt_toolkit.completion import WordCompleter
-from piecash import open_book
-import warnings
-from sqlalchemy.exc import SAWarning
-
-# Filter irrelevant SQLAlchemy warnings
-warnings.filterwarnings("ignore", category=SAWarning, module="piecash")
+from prompt_toolkit.completion import Completer, Completion
+try:
+    import marisa_trie  # prefix lookups in O(len(prefix)) instead of a scan per keystroke
+except ImportError:
+    marisa_trie = None
+try:
+    import orjson  # C parser/serializer for the JSON files loaded and saved per session
+except ImportError:
+    orjson = None
 
 # Persistent mapping of vendor -> {description, account}
 VENDOR_DEFAULTS_FILE = Path("vendor_defaults.json")
@@ -85,45 +91,54 @@ VENDOR_DEFAULTS_FILE = Path("vendor_defaults.json")
 # persistent set/list of prior descriptions (used for autocomplete)
 DESCRIPTIONS_FILE = Path("description_memory.json")
 
-def load_description_memory() -> list[str]:
+# Sorted vendor names from the last run, reused while the book file is unchanged
+VENDOR_CACHE_FILE = Path("vendors.cache.pkl")
+
+# Non-negative amount up to 9999.99 with at most two decimal places
+_AMOUNT_RE = re.compile(r"(?:\d{1,4}(?:\.\d{0,2})?|\.\d{1,2})")
+
+def read_json(path: Path):
+    """
+    Parse the JSON file at path, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def write_json(path: Path, data) -> None:
+    """
+    Write data to path as indented JSON, using orjson when it is installed.
+    """
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+def load_description_memory() -> dict[str, None]:
     """
     Load previously used descriptions from JSON for cross-run autocomplete.
-    Returns a list (kept unique by simple membership checks on save).
+    Returns an insertion-ordered dict used as a set, so adding is unique by construction.
     """
     if DESCRIPTIONS_FILE.exists():
         try:
-            with open(DESCRIPTIONS_FILE, "r") as f:
-                data = json.load(f)
+            data = read_json(DESCRIPTIONS_FILE)
             if isinstance(data, list):
-                return data
+                return dict.fromkeys(d for d in data if d)
         except Exception:
             pass
-    return []
+    return {}
 
-def save_description_memory(descriptions: list[str]) -> None:
+def save_description_memory(descriptions: dict[str, None]) -> None:
     """
     Save unique descriptions list to disk for future runs.
     """
-    # keep items unique while preserving order
-    seen = set()
-    unique = []
-    for d in descriptions:
-        if d and d not in seen:
-            seen.add(d)
-            unique.append(d)
-    with open(DESCRIPTIONS_FILE, "w") as f:
-        json.dump(unique, f, indent=2)
+    write_json(DESCRIPTIONS_FILE, list(descriptions))
 
 def is_valid_amount(value: str) -> bool:
-    try:
-        amount = float(value)
-        # Ensure it's non-negative, <= 9999.99, and has at most 2 decimal places
-        return (
-            0 <= amount <= 9999.99
-            and round(amount, 2) == amount
-        )
-    except ValueError:
-        return False
+    # One fullmatch covers the sign, the 9999.99 ceiling and the 2 decimal places,
+    # without the float rounding checks
+    return _AMOUNT_RE.fullmatch(value) is not None
 
 
 def get_unique_output_path(base_path: Path) -> Path:
@@ -131,25 +146,32 @@ def get_unique_output_path(base_path: Path) -> Path:
     Given a base filename (e.g., bills_20250806.csv), return a Path that does not yet exist.
     If the file exists, appends _1, _2, etc. until it finds an available name.
     """
-    if not base_path.exists():
+    parent = base_path.parent
+    # One scandir pass instead of a stat() per candidate name
+    try:
+        with os.scandir(parent) as it:
+            existing = {os.path.normcase(e.name) for e in it}
+    except FileNotFoundError:
+        existing = set()
+    if os.path.normcase(base_path.name) not in existing:
         return base_path
 
     stem = base_path.stem
     suffix = base_path.suffix
-    parent = base_path.parent
 
     counter = 1
-    while True:
-        new_name = f"{stem}_{counter}{suffix}"
-        new_path = parent / new_name
-        if not new_path.exists():
-            return new_path
+    while os.path.normcase(f"{stem}_{counter}{suffix}") in existing:
         counter += 1
+    return parent / f"{stem}_{counter}{suffix}"
 
 
 def load_vendor_names(gnucash_file: Path) -> list[str]:
     """
-    Load all known vendor names from a GnuCash SQLite database using piecash.
+    Load all known vendor names from a GnuCash SQLite database.
+
+    Reads the vendors table directly (read-only) instead of opening the book
+    with piecash, and caches the result in VENDOR_CACHE_FILE keyed by the
+    book's path, modification time and size, so unchanged books skip the query.
 
     Args:
         gnucash_file: Path to the SQLite GnuCash book.
@@ -157,26 +179,120 @@ def load_vendor_names(gnucash_file: Path) -> list[str]:
     Returns:
         Sorted list of vendor names as strings.
     """
-    with open_book(str(gnucash_file), readonly=True) as book:
-        return sorted([vendor.name for vendor in book.vendors])
+    book_path = gnucash_file.resolve()
+    stat = book_path.stat()
+    key = (str(book_path), stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(VENDOR_CACHE_FILE, "rb") as f:
+            cached_key, names = pickle.load(f)
+        if cached_key == key:
+            return names
+    except Exception:
+        pass  # no cache yet, or unreadable: rebuild it
+
+    conn = sqlite3.connect(f"{book_path.as_uri()}?mode=ro", uri=True)
+    try:
+        names = sorted(name for (name,) in conn.execute("SELECT name FROM vendors"))
+    finally:
+        conn.close()
+
+    try:
+        with open(VENDOR_CACHE_FILE, "wb") as f:
+            pickle.dump((key, names), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # caching is best effort
+    return names
+
+
+class NameIndex:
+    """
+    Case-insensitive lookup over a list of names (vendors, descriptions).
 
+    The names are lowered once. Prefix queries walk a marisa-trie of the lowered
+    names when it is installed and otherwise bisect a sorted copy, so a keystroke
+    costs O(log N + matches) rather than a scan. Substring queries narrow the
+    candidates through a trigram index. Results keep the order of the list.
+    """
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        self.lowered = [v.lower() for v in names]
+        # lowered name -> positions in names (names may differ only by case)
+        self._positions: dict[str, list[int]] = {}
+        for i, key in enumerate(self.lowered):
+            self._positions.setdefault(key, []).append(i)
+        self._keys = sorted(self._positions)
+        self._trie = marisa_trie.Trie(self._keys) if marisa_trie else None
+        self._trigrams: dict[str, set[int]] = {}
+        for i, key in enumerate(self.lowered):
+            for j in range(len(key) - 2):
+                self._trigrams.setdefault(key[j:j + 3], set()).add(i)
+
+    def _keys_starting_with(self, prefix: str) -> list[str]:
+        if self._trie is not None:
+            return self._trie.keys(prefix)
+        keys = self._keys
+        start = end = bisect_left(keys, prefix)
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+        return keys[start:end]
+
+    def starting_with(self, partial: str) -> list[str]:
+        """Return the names that start with partial, ignoring case."""
+        positions = self._positions
+        hits = sorted(i for key in self._keys_starting_with(partial.lower()) for i in positions[key])
+        return [self.names[i] for i in hits]
+
+    def containing(self, partial: str) -> list[str]:
+        """Return the names that contain partial past their first character, ignoring case."""
+        needle = partial.lower()
+        lowered = self.lowered
+        if len(needle) < 3:
+            candidates = range(len(lowered))
+        else:
+            grams = [self._trigrams.get(needle[j:j + 3], set()) for j in range(len(needle) - 2)]
+            candidates = sorted(min(grams, key=len).intersection(*grams))
+        return [
+            self.names[i] for i in candidates
+            if needle in lowered[i] and not lowered[i].startswith(needle)
+        ]
+
+
+class NameCompleter(Completer):
+    """
+    prompt_toolkit completer backed by a NameIndex.
 
-def match_vendor(partial: str, vendor_names: list[str]) -> str:
+    Offers names starting with the typed text first, then those that only
+    contain it, like WordCompleter(match_middle=True) with prefix hits on top.
+    """
+
+    def __init__(self, index: NameIndex):
+        self.index = index
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        start = -len(text)
+        for name in self.index.starting_with(text):
+            yield Completion(name, start_position=start)
+        for name in self.index.containing(text):
+            yield Completion(name, start_position=start)
+
+
+def match_vendor(partial: str, vendor_index: NameIndex) -> str:
     """
     Return the first matching vendor that starts with the given input.
     If no match, return the typed input unchanged.
     """
-    matches = [v for v in vendor_names if v.lower().startswith(partial.lower())]
+    matches = vendor_index.starting_with(partial)
     return matches[0] if matches else partial
 
 
-def prompt_vendor(vendor_names: list[str]) -> str:
+def prompt_vendor(vendor_completer: NameCompleter) -> str:
     """
     Prompt the user to select or type a vendor name with live fuzzy matching.
-    Uses prompt_toolkit's WordCompleter for interactive input.
+    Uses a NameCompleter built once per session for interactive input.
     """
-    completer = WordCompleter(vendor_names, ignore_case=True, sentence=True, match_middle=True)
-    vendor = prompt("Vendor name: ", completer=completer, complete_while_typing=True)
+    vendor = prompt("Vendor name: ", completer=vendor_completer, complete_while_typing=True)
     return vendor.strip()
 
 
@@ -188,8 +304,7 @@ def load_vendor_defaults() -> dict:
         Dictionary mapping vendor names to a dict of {description, account}.
     """
     if VENDOR_DEFAULTS_FILE.exists():
-        with open(VENDOR_DEFAULTS_FILE, "r") as f:
-            return json.load(f)
+        return read_json(VENDOR_DEFAULTS_FILE)
     return {}
 
 
@@ -200,8 +315,7 @@ def save_vendor_defaults(defaults: dict):
     Args:
         defaults: Dictionary to persist.
     """
-    with open(VENDOR_DEFAULTS_FILE, "w") as f:
-        json.dump(defaults, f, indent=2)
+    write_json(VENDOR_DEFAULTS_FILE, defaults)
 
 
 def main():
@@ -222,9 +336,11 @@ def main():
 
     # Load vendor names from GnuCash and any previously saved vendor defaults
     vendor_names = load_vendor_names(gnucash_file)
+    vendor_completer = NameCompleter(NameIndex(vendor_names))
     vendor_defaults = load_vendor_defaults()
     # load cross-run descriptions and initialize session defaults
     description_memory = load_description_memory()
+    desc_completer = NameCompleter(NameIndex(list(description_memory)))
     session_default_desc = ""  # becomes "sticky" after first non-empty description
     last_date = datetime.now().strftime("%m/%d/%Y")  # default date for first entry
 
@@ -236,23 +352,16 @@ def main():
     if output_file.exists():
         mtime = output_file.stat().st_mtime
         timestamp = datetime.fromtimestamp(mtime).strftime("%Y%m%d_%H%M%S")
-        backup_file = output_file.with_name(f"raw_bills_{timestamp}.csv")
-
         # Ensure uniqueness if somehow that backup name already exists
-        counter = 1
-        while backup_file.exists():
-            backup_file = output_file.with_name(f"raw_bills_{timestamp}_{counter}.csv")
-            counter += 1
+        backup_file = get_unique_output_path(output_file.with_name(f"raw_bills_{timestamp}.csv"))
 
         output_file.rename(backup_file)
 
     # Now write the new file as raw_bills.csv
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f, delimiter=";")
     print(f"Writing to: {output_file}\n")
 
     # Open output CSV file and write header row
-    with open(output_file, "w", newline="") as f:
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
         # Write semicolon-separated CSV instead of default comma-separated
         writer = csv.writer(f, delimiter=';')
         writer.writerow(["", "vendor name", "date", "description", "account", "amount", "1"])
@@ -260,7 +369,7 @@ def main():
         # Start interactive session
         while True:
             print("\n--- New Bill Entry ---")
-            vendor = prompt_vendor(vendor_names)
+            vendor = prompt_vendor(vendor_completer)
 
             # Lookup saved defaults for this vendor if available
             prev_desc = vendor_defaults.get(vendor, {}).get("description", "")
@@ -269,15 +378,13 @@ def main():
 
             # Prompt for values, offering defaults when available
             amount_str = input("Amount (e.g. 1234.56): ").strip()
-            while not is_valid_amount(float(amount_str) if amount_str.replace('.', '', 1).isdigit() else amount_str):
+            while not is_valid_amount(amount_str):
                 print("❌ Must be a number with 2 decimal places, max value 9999.99.")
                 amount_str = input("Amount (e.g. 1234.56): ").strip()
 
             amount = f"{float(amount_str):.2f}"  # Format to two decimals as string
 
             # NEW: description autocomplete + sticky default across entries
-            desc_completer = WordCompleter(description_memory, ignore_case=True, sentence=True, match_middle=True)
-
             # Prefer sticky session default; if not set yet, fall back to vendor default
             desc_default_to_show = session_default_desc or prev_desc
             desc = prompt(
@@ -290,7 +397,9 @@ def main():
             if desc:
                 session_default_desc = desc
                 if desc not in description_memory:
-                    description_memory.append(desc)
+                    # Only a new description requires re-indexing
+                    description_memory[desc] = None
+                    desc_completer = NameCompleter(NameIndex(list(description_memory)))
 
             account = input(f"Account [{prev_account}]: ").strip() or prev_account
 
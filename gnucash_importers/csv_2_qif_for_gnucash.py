@@ -18,9 +18,9 @@ CSV columns (header required):
   - Commission (decimal, positive)
   - Location   (string)
 """
-import glob
 import csv
 import argparse
+import os
 import sys
 from datetime import date
 
@@ -30,6 +30,8 @@ PAYEE_COL = "Location"
 MEMO       = "ATM sales commission"
 CATEGORY   = "Sales Commission Paid"
 DEFAULT_ACCOUNT = "BillPay Account **6241"
+OUTPUT_BUFFER_SIZE = 1 << 20  # bytes
+WRITE_BATCH_SIZE = 1024      # records per writelines() call
 
 
 def format_today_qif_date() -> str:
@@ -39,7 +41,11 @@ def format_today_qif_date() -> str:
 
 def select_csv_file() -> str:
     """List all CSVs in cwd and let the user pick one."""
-    csv_files = sorted(glob.glob('*.csv'))
+    # One scandir pass, matching what glob('*.csv') found: no dotfiles, OS case rules
+    with os.scandir('.') as it:
+        csv_files = sorted(e.name for e in it
+                           if not e.name.startswith('.')
+                           and os.path.normcase(e.name).endswith('.csv') and e.is_file())
     if not csv_files:
         print("No CSV files found in the current directory.", file=sys.stderr)
         sys.exit(1)
@@ -73,46 +79,54 @@ def generate_qif(input_csv: str,
     """Read checks from CSV and write QIF with fixed settings and optional account header."""
     today_qif = format_today_qif_date()
     with open(input_csv, newline='', encoding='utf-8') as csvfile, \
-         open(output_qif, 'w', encoding='utf-8') as qif:
+         open(output_qif, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8') as qif:
 
-        reader = csv.DictReader(csvfile)
+        # Plain csv.reader with the two column positions resolved once;
+        # DictReader would build a dict for every row
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
         # Validate required columns
-        missing = [c for c in (AMOUNT_COL, PAYEE_COL) if c not in reader.fieldnames]
+        missing = [c for c in (AMOUNT_COL, PAYEE_COL) if c not in header]
         if missing:
             print(f"Error: CSV is missing required columns: {missing}", file=sys.stderr)
-            print("Available columns:", reader.fieldnames, file=sys.stderr)
+            print("Available columns:", header, file=sys.stderr)
             sys.exit(1)
+        amount_i = header.index(AMOUNT_COL)
+        payee_i = header.index(PAYEE_COL)
+        width = max(amount_i, payee_i) + 1
 
-        # Optional QIF account declaration
-        qif.write('!Account\n')
-        qif.write(f'N{account_name}\n')
-        qif.write('TBank\n')
-        qif.write('^\n')
+        # Optional QIF account declaration, then the transactions header
+        qif.write(f'!Account\nN{account_name}\nTBank\n^\n!Type:Bank\n')
 
-        # Transactions header
-        qif.write('!Type:Bank\n')
+        # Only the check number, amount and payee vary per record
+        record_prefix = f'D{today_qif}\n'
+        record_suffix = f'M{MEMO}\nL{CATEGORY}\n^\n'
 
         check_num = start_num
+        batch = []
         for row in reader:
-            raw_amt   = row[AMOUNT_COL]
-            raw_payee = row[PAYEE_COL]
-
-            # Parse amount
+            if not row:
+                continue  # blank line
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+            raw_amt   = row[amount_i]
+            raw_payee = row[payee_i]
+
+            # Parse amount (try/except costs nothing unless the value is bad)
             try:
                 amount = -abs(float(raw_amt))
             except ValueError:
                 print(f"Bad amount '{raw_amt}' in row {reader.line_num}", file=sys.stderr)
                 sys.exit(1)
 
-            # Write QIF record
-            qif.write(f'D{today_qif}\n')
-            qif.write(f'N{check_num}\n')
-            qif.write(f'T{amount:.2f}\n')
-            qif.write(f'P{raw_payee}\n')
-            qif.write(f'M{MEMO}\n')
-            qif.write(f'L{CATEGORY}\n')
-            qif.write('^\n')
+            # Queue QIF record
+            batch.append(f'{record_prefix}N{check_num}\nT{amount:.2f}\nP{raw_payee}\n{record_suffix}')
             check_num += 1
+            if len(batch) >= WRITE_BATCH_SIZE:
+                qif.writelines(batch)
+                batch.clear()
+
+        qif.writelines(batch)
 
     print(f"✓ Wrote {output_qif} to account '{account_name}' with checks dated {today_qif}, starting at {start_num}")
 
@@ -19,39 +19,96 @@ Arguments:
 
 Processing Steps:
   1. Parse command-line arguments and validate the input file.
-  2. Read all rows via csv.DictReader and verify required columns.
-  3. Collect unique company names and fetch their contact info via
-     the Google Places API (through vendor_locator.find_vendor_contacts()).
-  4. For each row, overwrite address fields (addr1, addr2, addr4) by
-     splitting the formatted address into street, city/state/zip, country.
+  2. First pass: verify required columns and collect unique company names.
+  3. Fetch contact info for those names via the Google Places API
+     (through vendor_locator.find_vendor_contacts()).
+  4. Second pass: re-read the input and, for each row, overwrite address
+     fields (addr1, addr2, addr4) by splitting the formatted address into
+     street, city/state/zip, country.
      Preserve addr3 and copy the addrX values into shipping address fields.
   5. Overwrite phone/shipment phone and email/shipment email if found.
-  6. Write the enriched rows to the output CSV with the original column order.
+  6. Write each enriched row to the output CSV as soon as it is read,
+     keeping the original column order.
 
 Requirements:
     - vendor_locator.py must be in the PYTHONPATH, providing:
         def find_vendor_contacts(vendor_names: List[str]) -> Dict[str, VendorContact]
     - loguru for logging
-    - python-dotenv, requests, geopy, beautifulsoup4, pydantic for vendor_locator
+    - python-dotenv, aiohttp, geopy for vendor_locator
+    - a Google API key with "Places API (New)" (places.googleapis.com) enabled;
+      a key that only has the legacy Places API is refused with HTTP 403
+    - orjson (optional) for faster parsing of Places responses
+    - google-re2 (optional) for linear-time address / mailto matching
+    - polars (optional) for a faster first pass over large input CSVs
 
 """
 import os
+import re
+import json
+import asyncio
+import hashlib
+import html
+import sqlite3
+import time
+from functools import lru_cache
+from dataclasses import dataclass, asdict, replace
 from typing import List, Dict, Optional, Tuple
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
 import sys
 import csv
 from pathlib import Path
 from loguru import logger
 from dotenv import load_dotenv
-from pydantic import BaseModel
 from geopy.geocoders import Nominatim
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+try:
+    import orjson
+except ImportError:  # fall back to the (slower) stdlib parser
+    import json as orjson
+try:
+    import polars as pl  # native multi-threaded CSV scan for the name-collection pass
+except ImportError:
+    pl = None
+try:
+    import re2 as _regex  # google-re2: linear-time matching, re-compatible API
+except ImportError:
+    _regex = re
 
 # Load environment variables from .env if present
 load_dotenv()
 
-class VendorContact(BaseModel):
+# Places API (New): one searchText call returns every field we need.
+# It is enabled per project separately from the legacy Places API.
+PLACES_SEARCH_TEXT_URL = "https://places.googleapis.com/v1/places:searchText"
+PLACES_FIELD_MASK = (
+    "places.displayName,places.formattedAddress,"
+    "places.nationalPhoneNumber,places.websiteUri"
+)
+PLACES_MAX_BIAS_RADIUS = 50000.0  # metres; upper limit for a circle locationBias
+PLACES_CONCURRENCY    = 20   # vendors looked up at the same time
+HTTP_CONNECTION_LIMIT = 50   # open sockets shared by the whole batch
+WEBSITE_TIMEOUT = aiohttp.ClientTimeout(total=5)
+# Transient Places failures are retried with exponential backoff (0.5s, 1s, 2s, ...)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 5
+RETRY_BACKOFF  = 0.5  # seconds
+# First mailto: link on a page; scanned over raw bytes instead of parsing the DOM.
+# The value may be unquoted, and is entity- and %-decoded after matching.
+_MAILTO_RE = _regex.compile(rb'''(?i)href\s*=\s*["']?mailto:([^"'?\s>]+)''')
+# "street, [city, state zip,] country" -- the middle group absorbs any inner commas
+# (flags are inline so the patterns compile unchanged under re2 and re)
+_ADDR_RE = _regex.compile(r'(?s)\s*([^,]*?)\s*,(?:\s*(.*?)\s*,)?\s*([^,]*?)\s*')
+_ADDR_SEP_RE = _regex.compile(r'\s*,\s*')
+
+# Persistent cache of resolved vendors, so repeat imports skip the Places API
+PLACES_CACHE_FILE = Path.home() / ".cache" / "gnucash_importers" / "places.sqlite"
+PLACES_CACHE_TTL  = 30 * 24 * 60 * 60  # seconds (30 days)
+
+# Large write buffer so many CSV rows go out per write() syscall
+OUTPUT_BUFFER_SIZE = 1 << 20  # bytes
+
+@dataclass(slots=True)
+class VendorContact:
     name: str
     address: Optional[str] = None
     phone:   Optional[str] = None
@@ -66,18 +123,88 @@ def _geocode_location(location_str: str) -> Tuple[float, float]:
     logger.debug(f"Geocoded '{location_str}' → ({loc.latitude}, {loc.longitude})")
     return loc.latitude, loc.longitude
 
-def _extract_email_from_website(url: str) -> Optional[str]:
+async def _extract_email_from_website(
+    session: aiohttp.ClientSession, url: str
+) -> Optional[str]:
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        link = soup.select_one('a[href^="mailto:"]')
-        if link:
-            return link["href"].split("mailto:")[1].split("?")[0]
+        async with session.get(url, timeout=WEBSITE_TIMEOUT) as resp:
+            resp.raise_for_status()
+            page = await resp.read()
+        m = _MAILTO_RE.search(page)
+        if m:
+            # e.g. "info&#64;acme.com" or "info%40acme.com" -> "info@acme.com"
+            return unquote(html.unescape(m.group(1).decode("utf-8", "replace"))).strip()
     except Exception as e:
         logger.warning(f"Couldn’t scrape email from {url}: {e}")
     return None
 
+async def _request_with_retry(
+    session: aiohttp.ClientSession, method: str, url: str, **kwargs
+) -> aiohttp.ClientResponse:
+    """
+    Send a request, retrying 429/5xx responses, connection errors and
+    timeouts with exponential backoff (honouring Retry-After when present).
+    The final response is returned whatever its status; use it with
+    `async with` so it is released.
+    """
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+        try:
+            resp = await session.request(method, url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            reason = repr(e)
+        else:
+            if resp.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS:
+                return resp
+            reason = f"HTTP {resp.status}"
+            retry_after = resp.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            resp.release()
+        logger.debug(f"{method} {url} failed ({reason}); retry {attempt} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def _first_place(resp: aiohttp.ClientResponse) -> Optional[dict]:
+    """
+    Return the first entry of a searchText response's `places` array.
+    The body is read in full so the keep-alive connection goes back to the pool.
+    """
+    places = orjson.loads(await resp.read()).get("places", [])
+    return places[0] if places else None
+
+async def _error_message(resp: aiohttp.ClientResponse) -> str:
+    """
+    Return the `error.message` of a Google API error response, or the HTTP
+    reason phrase if the body has none.
+    """
+    try:
+        return orjson.loads(await resp.read())["error"]["message"]
+    except Exception:
+        return resp.reason or ""
+
+def _cache_key(name: str, location_str: str, radius: int) -> str:
+    return hashlib.sha1(
+        f"{name.lower().strip()}|{location_str}|{radius}".encode()
+    ).hexdigest()
+
+def _open_places_cache() -> Optional[sqlite3.Connection]:
+    """
+    Open (creating if needed) the on-disk Places cache.
+    Returns None if the cache cannot be used; lookups then always hit the API.
+    """
+    try:
+        PLACES_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(PLACES_CACHE_FILE)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS places (key TEXT PRIMARY KEY, json TEXT, ts INTEGER)"
+        )
+        return conn
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Places cache unavailable ({PLACES_CACHE_FILE}): {e}")
+        return None
+
 def _clean_domain(raw_url: str) -> str:
     """
     Strip everything after the domain from a URL.
@@ -86,6 +213,110 @@ def _clean_domain(raw_url: str) -> str:
     parts = urlparse(raw_url)
     return f"{parts.scheme}://{parts.netloc}"
 
+async def _fetch_vendor(
+    session: aiohttp.ClientSession,
+    sem: asyncio.Semaphore,
+    name: str,
+    lat: float,
+    lng: float,
+    radius: int,
+    api_key: str,
+    email_tasks: List[Tuple[VendorContact, asyncio.Task]],
+) -> VendorContact:
+    """
+    Resolve a single vendor with one Places searchText call, whose field mask
+    returns address / phone / website directly (no separate details call).
+    The website email scrape is scheduled as a task (appended to
+    `email_tasks`) instead of being awaited here, so it overlaps with the
+    remaining vendors' lookups.
+    """
+    async with sem:
+        logger.info(f"Searching for '{name}' near {lat:.4f},{lng:.4f}")
+        async with await _request_with_retry(
+            session, "POST", PLACES_SEARCH_TEXT_URL,
+            headers={
+                "X-Goog-Api-Key":   api_key,
+                "X-Goog-FieldMask": PLACES_FIELD_MASK,
+            },
+            json={
+                "textQuery": name,
+                "pageSize":  1,  # only the best match is used
+                "locationBias": {"circle": {
+                    "center": {"latitude": lat, "longitude": lng},
+                    "radius": min(float(radius), PLACES_MAX_BIAS_RADIUS),
+                }},
+            },
+        ) as resp:
+            if resp.status == 403:
+                # Same answer for every vendor, so stop the batch instead of logging it N times
+                raise PermissionError(
+                    f"Google Places searchText refused the API key (403): {await _error_message(resp)} "
+                    '-- enable "Places API (New)" for the key\'s project; the legacy Places API is not enough'
+                )
+            resp.raise_for_status()
+            place = await _first_place(resp)
+        if not place:
+            logger.warning(f"No Google Place found for '{name}'")
+            return VendorContact(name=name)
+
+        raw_site = place.get("websiteUri")
+        clean_site = _clean_domain(raw_site) if raw_site else None
+
+        contact = VendorContact(
+            name    = name,
+            address = place.get("formattedAddress"),
+            phone   = place.get("nationalPhoneNumber"),
+            website = clean_site,
+        )
+
+        # If we got a website, start scraping it for an email in the background
+        if contact.website:
+            email_tasks.append((contact, asyncio.create_task(
+                _extract_email_from_website(session, contact.website)
+            )))
+
+        return contact
+
+async def _gather(
+    vendor_names: List[str],
+    lat: float,
+    lng: float,
+    radius: int,
+    api_key: str,
+) -> list:
+    """
+    Look up all vendors concurrently over one pooled ClientSession.
+    Returns one VendorContact (or the raised exception) per name, in order.
+    A PermissionError (API key refused) cancels the remaining lookups and is raised.
+    """
+    sem = asyncio.Semaphore(PLACES_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=HTTP_CONNECTION_LIMIT)
+    email_tasks: List[Tuple[VendorContact, asyncio.Task]] = []
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def lookup(name: str):
+            try:
+                return await _fetch_vendor(session, sem, name, lat, lng, radius, api_key, email_tasks)
+            except PermissionError:
+                raise
+            except Exception as e:
+                return e
+
+        lookups = [asyncio.create_task(lookup(name)) for name in vendor_names]
+        try:
+            outcomes = await asyncio.gather(*lookups)
+        except PermissionError:
+            for task in lookups + [task for _, task in email_tasks]:
+                task.cancel()
+            raise
+        # Collect the email scrapes that have been running alongside the lookups
+        emails = await asyncio.gather(
+            *(task for _, task in email_tasks), return_exceptions=True
+        )
+    for (contact, _), email in zip(email_tasks, emails):
+        if isinstance(email, str):
+            contact.email = email
+    return outcomes
+
 def find_vendor_contacts(
     vendor_names: List[str],
     location_str: Optional[str] = None,
@@ -95,6 +326,9 @@ def find_vendor_contacts(
     """
     Look up each vendor name near `location_str` (default: your current location)
     using the Google Places API, then scrape their website for an email if present.
+    All vendors are looked up concurrently (at most PLACES_CONCURRENCY at a time);
+    vendors resolved within the last PLACES_CACHE_TTL are served from the cache.
+    Raises PermissionError if the key is refused by Places API (New).
     """
     # 1) Determine API key from multiple sources
     api_key = (
@@ -108,61 +342,71 @@ def find_vendor_contacts(
             "Set GOOGLE_PLACES_API_KEY / GOOGLE_API_KEY in your environment or pass it in."
         )
 
-    # Geocode if no location provided
     if location_str is None:
         location_str = "New Albany, Indiana, United States"
-    lat, lng = _geocode_location(location_str)
-
-    base_textsearch = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    base_details    = "https://maps.googleapis.com/maps/api/place/details/json"
 
+    # 2) Serve what we can from the persistent cache
     results: Dict[str, VendorContact] = {}
-
-    for name in vendor_names:
-        logger.info(f"Searching for '{name}' near {lat:.4f},{lng:.4f}")
-        try:
-            # Text Search to get a place_id
-            resp = requests.get(base_textsearch, params={
-                "query":    name,
-                "location": f"{lat},{lng}",
-                "radius":   radius,
-                "key":      api_key,
-            })
-            resp.raise_for_status()
-            items = resp.json().get("results", [])
-            if not items:
-                logger.warning(f"No Google Place found for '{name}'")
-                results[name] = VendorContact(name=name)
-                continue
-
-            place_id = items[0]["place_id"]
-
-            # Place Details for address / phone / website
-            det = requests.get(base_details, params={
-                "place_id": place_id,
-                "fields":   "formatted_address,formatted_phone_number,website",
-                "key":      api_key,
-            }).json().get("result", {})
-
-            raw_site = det.get("website")
-            clean_site = _clean_domain(raw_site) if raw_site else None
-
-            contact = VendorContact(
-                name    = name,
-                address = det.get("formatted_address"),
-                phone   = det.get("formatted_phone_number"),
-                website = clean_site,
-            )
-
-            # If we got a website, try scraping for an email
-            if contact.website:
-                contact.email = _extract_email_from_website(contact.website)
-
-            results[name] = contact
-
-        except Exception as e:
-            logger.error(f"Error finding '{name}': {e}")
-            results[name] = VendorContact(name=name)
+    keys = {name: _cache_key(name, location_str, radius) for name in vendor_names}
+    cache = _open_places_cache()
+    try:
+        misses: Dict[str, List[str]] = {}   # cache key -> every name spelled that way
+        cutoff = int(time.time()) - PLACES_CACHE_TTL
+        for name in vendor_names:
+            row = None
+            if cache:
+                try:
+                    row = cache.execute(
+                        "SELECT json FROM places WHERE key = ? AND ts > ?", (keys[name], cutoff)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    # Locked, read-only or corrupt: stop using the cache for this run
+                    # rather than waiting on it again for every remaining name
+                    logger.warning(f"Places cache read failed ({PLACES_CACHE_FILE}): {e}")
+                    cache.close()
+                    cache = None
+            if row:
+                contact = VendorContact(**json.loads(row[0]))
+                contact.name = name
+                results[name] = contact
+            else:
+                misses.setdefault(keys[name], []).append(name)
+        if cache:
+            logger.info(f"Places cache: {len(results)} hit(s), {len(misses)} miss(es)")
+        if not misses:
+            return results
+
+        # 3) Geocode the search centre and look up each distinct remaining vendor once
+        lat, lng = _geocode_location(location_str)
+        lookup_names = [names[0] for names in misses.values()]
+        outcomes = asyncio.run(_gather(lookup_names, lat, lng, radius, api_key))
+
+        fresh = []
+        now = int(time.time())
+        for (key, names), outcome in zip(misses.items(), outcomes):
+            if isinstance(outcome, Exception):
+                # Errors are not cached, so the vendor is retried next run
+                logger.error(f"Error finding '{names[0]}': {outcome}")
+                outcome = VendorContact(name=names[0])
+            else:
+                fresh.append((key, json.dumps(asdict(outcome)), now))
+            # Fan the single lookup out to every spelling of the name
+            for name in names:
+                results[name] = replace(outcome, name=name)
+
+        # 4) Store the new lookups in a single transaction
+        if cache and fresh:
+            try:
+                with cache:
+                    cache.executemany(
+                        "INSERT OR REPLACE INTO places (key, json, ts) VALUES (?, ?, ?)", fresh
+                    )
+            except sqlite3.Error as e:
+                # The lookups are still returned; they just aren't cached this run
+                logger.warning(f"Places cache write failed ({PLACES_CACHE_FILE}): {e}")
+    finally:
+        if cache:
+            cache.close()
 
     return results
 
@@ -172,23 +416,51 @@ def _parse_address_components(address: str) -> dict:
       - addr1: the street portion (everything before the first comma).
       - addr2: the middle portion (city, state, zip) if present.
       - addr4: the final portion (country) if present.
-    If the address has fewer than 2 commas, street is the full string,
-    and addr2/addr4 may be empty.
+    If the address has no comma, street is the full string and
+    addr2/addr4 are empty; with a single comma addr2 is empty.
     """
-    # Split on commas and trim whitespace
-    parts = [part.strip() for part in address.split(',')]
-    if len(parts) >= 2:
-        street = parts[0]                 # first segment → street
-        country = parts[-1]               # last segment → country
-        middle = ', '.join(parts[1:-1])   # everything in between → city/state/zip
-    else:
-        # Fallback: treat entire address as street if no comma found
-        street = address
-        middle = ''
-        country = ''
+    street, middle, country = _split_address(address)
     return {'addr1': street, 'addr2': middle, 'addr4': country}
 
 
+@lru_cache(maxsize=1024)
+def _split_address(address: str) -> Tuple[str, str, str]:
+    """
+    Regex-based (street, middle, country) split behind _parse_address_components.
+    Cached because chain vendors often share the same formatted address.
+    """
+    m = _ADDR_RE.fullmatch(address)
+    if not m:
+        # Fallback: treat entire address as street if no comma found
+        return address, '', ''
+    street, middle, country = m.groups()
+    # Normalise inner separators to ", " (city, state zip)
+    return street, _ADDR_SEP_RE.sub(', ', middle) if middle else '', country
+
+
+def _unique_company_names(input_path: Path, rows, company_i: int) -> List[str]:
+    """
+    Return the sorted, non-empty company names of the input CSV.
+    `rows` is a csv.reader positioned just after the header; it is only
+    consumed when polars is unavailable or cannot parse the file.
+    """
+    if pl is not None:
+        try:
+            return (
+                pl.scan_csv(input_path, separator=';', infer_schema_length=0)
+                .select(pl.col('company'))
+                .filter(pl.col('company').is_not_null() & (pl.col('company') != ''))
+                .unique()
+                .sort('company')
+                .collect()
+                .to_series()
+                .to_list()
+            )
+        except pl.exceptions.PolarsError as e:
+            logger.debug(f"polars could not scan {input_path} ({e}); using csv module")
+    return sorted({row[company_i] for row in rows if len(row) > company_i and row[company_i]})
+
+
 def process_vendor_csv():
     """
     Main entry point: validate args, read input CSV, enrich each row,
@@ -217,60 +489,93 @@ def process_vendor_csv():
         output_path = input_path.with_name(
             f"{input_path.stem}_with_contacts{input_path.suffix}"
         )
+    # The input is re-read while the output is written, so they must differ
+    if output_path.resolve() == input_path.resolve():
+        logger.error("Output CSV must not be the same file as the input CSV")
+        sys.exit(1)
 
-    # 2) Read the input CSV into memory (semicolon-separated only)
-    with input_path.open(newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f, delimiter=';')  # enforce semicolon input
-        fieldnames = reader.fieldnames or []
-        # Define the required set of fields to operate correctly
-        required_cols = {
-            'company', 'addr1', 'addr2', 'addr3', 'addr4',
-            'shipaddr1', 'shipaddr2', 'shipaddr3', 'shipaddr4',
-            'phone', 'shiphone', 'email', 'shipmail'
-        }
-        # Abort if any required column is missing
-        if not required_cols.issubset(set(fieldnames)):
-            logger.error(
-                f"Input CSV must contain columns: {sorted(required_cols)}"
-            )
-            sys.exit(1)
-        # Load all rows for post-processing
-        rows = list(reader)
+    # Define the required set of fields to operate correctly
+    required_cols = {
+        'company', 'addr1', 'addr2', 'addr3', 'addr4',
+        'shipaddr1', 'shipaddr2', 'shipaddr3', 'shipaddr4',
+        'phone', 'shiphone', 'email', 'shipmail'
+    }
 
-    # 3) Aggregate unique company names for a single Places API batch lookup
-    company_names = sorted({row['company'] for row in rows if row.get('company')})
-    contacts = find_vendor_contacts(company_names)
+    # 2) First pass: validate the header and collect company names (semicolon-separated only)
+    try:
+        with input_path.open(newline='', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter=';')  # enforce semicolon input
+            header = next(reader, [])
+            # Map column name -> position; rows are handled as plain lists
+            idx = {col: i for i, col in enumerate(header)}
+            # Abort if any required column is missing
+            missing = required_cols - idx.keys()
+            if missing:
+                logger.error(
+                    f"Input CSV must contain columns: {sorted(required_cols)} "
+                    f"(missing: {sorted(missing)})"
+                )
+                sys.exit(1)
+            company_i = idx['company']
+            # Aggregate unique company names for a single Places API batch lookup
+            company_names = _unique_company_names(input_path, reader, company_i)
+    except UnicodeDecodeError as e:
+        # The whole file is decoded here, so the second pass cannot hit this
+        logger.error(f"Input file {input_path} is not valid UTF-8: {e}")
+        sys.exit(1)
 
-    # 4) Write enriched data using semicolon-separated output
-    out_fieldnames = fieldnames
-    with output_path.open('w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=out_fieldnames, delimiter=';')  # enforce semicolon output
-        writer.writeheader()
+    # 3) Look up contacts for every company at once
+    try:
+        contacts = find_vendor_contacts(company_names)
+    except PermissionError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    # 4) Second pass: stream rows from input to output (semicolon-separated)
+    width = len(header)
+    addr1_i, addr2_i, addr3_i, addr4_i = (idx[c] for c in ('addr1', 'addr2', 'addr3', 'addr4'))
+    ship1_i, ship2_i, ship3_i, ship4_i = (
+        idx[c] for c in ('shipaddr1', 'shipaddr2', 'shipaddr3', 'shipaddr4')
+    )
+    phone_i, shiphone_i, email_i, shipmail_i = (
+        idx[c] for c in ('phone', 'shiphone', 'email', 'shipmail')
+    )
+    with input_path.open(newline='', encoding='utf-8') as f_in, \
+         output_path.open('w', buffering=OUTPUT_BUFFER_SIZE, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f_in, delimiter=';')
+        next(reader, None)  # header already validated
+        writer = csv.writer(f, delimiter=';')  # enforce semicolon output
+        writer.writerow(header)
+
+        # Bind hot-loop callables to locals (LOAD_FAST instead of attribute/global lookups)
+        contacts_get = contacts.get
+        split_address = _split_address
+        writerow = writer.writerow
 
         # 5) Process each row: overwrite address and contact fields if available
-        for row in rows:
-            name = row.get('company')
-            contact = contacts.get(name)
-            if contact and contact.address:
-                # Parse the formatted address into components
-                comps = _parse_address_components(contact.address)
-                row['addr1'] = comps['addr1']
-                row['addr2'] = comps['addr2']
-                row['addr4'] = comps['addr4']
-                # Duplicate into shipping address fields
-                row['shipaddr1'] = comps['addr1']
-                row['shipaddr2'] = comps['addr2']
-                row['shipaddr3'] = row.get('addr3', '')  # preserve original addr3
-                row['shipaddr4'] = comps['addr4']
+        for row in reader:
+            if len(row) < width:
+                # Short rows: treat missing trailing fields as empty
+                row.extend([''] * (width - len(row)))
+            contact = contacts_get(row[company_i])
             if contact:
+                address, phone, email = contact.address, contact.phone, contact.email
+                if address:
+                    # Parse the formatted address into components
+                    street, middle, country = split_address(address)
+                    row[addr1_i] = row[ship1_i] = street
+                    row[addr2_i] = row[ship2_i] = middle
+                    row[addr4_i] = row[ship4_i] = country
+                    # Duplicate into shipping address fields, preserving original addr3
+                    row[ship3_i] = row[addr3_i]
                 # Overwrite phone/email if found, otherwise keep existing
-                row['phone']    = contact.phone   or row.get('phone', '')
-                row['shiphone'] = contact.phone   or row.get('shiphone', '')
-                row['email']    = contact.email   or row.get('email', '')
-                row['shipmail'] = contact.email   or row.get('shipmail', '')
+                row[phone_i]    = phone   or row[phone_i]
+                row[shiphone_i] = phone   or row[shiphone_i]
+                row[email_i]    = email   or row[email_i]
+                row[shipmail_i] = email   or row[shipmail_i]
 
             # Write the enriched row to the output file
-            writer.writerow(row)
+            writerow(row)
 
     # 6) Log completion and output path for user confirmation
     logger.info(f"Wrote enriched CSV to {output_path}")
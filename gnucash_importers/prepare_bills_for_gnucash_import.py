@@ -16,6 +16,7 @@ Discussions are also getting old and the active developers are seeming to be jus
 I have decided to just use the unposted bills and let GnuCash handle the posting. -Conrad 8/8/2025
 """
 import csv
+import re
 import argparse
 from pathlib import Path
 from datetime import date, datetime
@@ -38,6 +39,7 @@ DEFAULT_ACCOUNT_FALLBACK = "MISC EXPENSE"
 DEFAULT_ACCOUNT_PARENT = "Expenses"
 DEFAULT_AP_ACCOUNT = "Liabilities:Accounts Payable"
 TODAY = date.today().isoformat()
+_XML_SNIFF = re.compile(rb"(?i)<\?xml|<gnucash")  # XML book signature in the first bytes
 
 BILL_FIELDS = [
     "id", "date_opened", "owner_id", "billingid", "notes", "date", "desc", "action",
@@ -90,8 +92,7 @@ def find_gnucash_db() -> Path | None:
 def is_xml_file(file_path: Path) -> bool:
     try:
         with file_path.open("rb") as f:
-            head = f.read(64).lower()
-            return b"<?xml" in head or b"<gnucash" in head
+            return _XML_SNIFF.search(f.read(64)) is not None
     except Exception as e:
         logger.warning(f"Could not read file to check XML format: {e}")
         return False